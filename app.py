@@ -1,18 +1,71 @@
+from __future__ import annotations
+
 import asyncio
+import atexit
+import json
+import math
 import os
+import string
+import threading
+import time
+from collections import OrderedDict
+from contextlib import aclosing
 from datetime import datetime
-from typing import Any, Dict, List
+from html import escape
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 import streamlit as st
+from jinja2 import Template
 
-from config import Config
-from dataforseo_labs import DataForSEOLabs
+from config import Config, config
+from dataforseo_labs import COMPETITION_COLORS, DataForSEOLabs
 from llm_generator import LLMGenerator
 from trends import TrendsAnalyzer
 
+# pandas and plotly are imported where results are rendered, so the landing
+# page does not pay for them on a cold start
+if TYPE_CHECKING:
+    import pandas as pd
+
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources")
+
+COMPETITION_CLASSES = {
+    level: f"competition-{level.lower()}" for level in COMPETITION_COLORS
+}
+
+_RELATED_TAG_OPEN = '<span class="related-keyword-tag">'
+_RELATED_TAG_CLOSE = "</span>"
+
+_KEYWORD_CARD_TEMPLATE = string.Template(
+    '<div class="keyword-card">'
+    '<div class="keyword-title">"$keyword"</div>'
+    '<div class="keyword-metrics">'
+    '<div><div class="metric-label">📊 Search Volume</div>'
+    '<div class="metric-highlight">$volume</div></div>'
+    '<div><div class="metric-label">💰 Avg. CPC</div>'
+    '<div class="metric-highlight">$cpc</div></div>'
+    '<div><div class="metric-label">🎯 SEO Difficulty</div>'
+    '<div class="metric-highlight">$difficulty/100</div></div>'
+    '<div><div class="metric-label">Competition</div>'
+    '<span class="competition-label $comp_class">$competition_level</span></div>'
+    '<div><div class="metric-label">💵 Est. Top of Page Bid</div>'
+    '<div class="metric-highlight">$low_bid - $high_bid</div></div>'
+    "</div>"
+    "$related_html"
+    "</div>"
+)
+
+_AD_PREVIEW_TEMPLATE = Template(
+    """
+<div style="padding: 5px 5px 0 5px;">
+    <p style="font-size: 1.1em; color: #1a0dab; font-weight: bold; margin: 0;">{{ headline }}</p>
+    <p style="color: #545454; margin-top: 5px; margin-bottom: 5px;">{{ description }}</p>
+</div>
+""",
+    autoescape=True,
+)
+
 st.set_page_config(
     page_title="Keywords & Campaigns",
     page_icon="🔍",
@@ -20,84 +73,295 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-st.markdown(
+
+@st.cache_data(show_spinner=False)
+def _css() -> str:
+    """App stylesheet, read from disk once per process instead of every rerun"""
+    with open(os.path.join(RESOURCES_DIR, "styles.css"), encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+@st.cache_data(show_spinner=False)
+def _logo() -> Optional[bytes]:
+    """Logo image bytes, read from disk once per process"""
+    logo_path = os.path.join(RESOURCES_DIR, "logo.png")
+    if not os.path.exists(logo_path):
+        return None
+    with open(logo_path, "rb") as f:
+        return f.read()
+
+
+@st.cache_resource(show_spinner=False)
+def _get_dataforseo_client(login: str, password: str) -> DataForSEOLabs:
+    """Shared DataForSEO Labs client, created once per set of credentials"""
+    client = DataForSEOLabs(
+        login=login,
+        password=password,
+        cache_dir=config.DATAFORSEO_CACHE_DIR or None,
+        cache_ttl=config.CACHE_DURATION,
+        cache_max_entries=config.DATAFORSEO_CACHE_MAX_ENTRIES,
+    )
+    # Cached resources live until the server stops, so release the pooled
+    # connections then
+    atexit.register(client.close)
+    return client
+
+
+@st.cache_resource(show_spinner=False)
+def _get_clients() -> Tuple[Config, Optional[DataForSEOLabs]]:
+    """Config and DataForSEO client shared by every session and rerun"""
+    credentials = config.get_dataforseo_credentials()
+    if credentials["login"] and credentials["password"]:
+        return config, _get_dataforseo_client(**credentials)
+    return config, None
+
+
+@st.cache_data(ttl=config.CACHE_DURATION, show_spinner=False)
+def _fetch_related_keywords(login: str, password: str, topic: str) -> List[Dict]:
     """
-<style>
-.main-header {
-    font-size: 3rem;
-    font-weight: bold;
-    text-align: center;
-    margin-bottom: 2rem;
-}
-.keyword-card {
-    background-color: #f8f9fa;
-    padding: 1rem;
-    border-radius: 0.75rem;
-    margin-bottom: 1rem;
-    border-left: 5px solid #007bff;
-    box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-    transition: all 0.2s ease-in-out;
-}
-.keyword-card:hover {
-    transform: translateY(-3px);
-    box-shadow: 0 6px 12px rgba(0,0,0,0.15);
-}
-.keyword-title {
-    font-size: 1.25rem;
-    font-weight: 600;
-    color: #333;
-    margin-bottom: 1rem;
-}
-.competition-label {
-    display: inline-block;
-    padding: 0.3rem 0.6rem;
-    border-radius: 1rem;
-    font-weight: 600;
-    font-size: 0.85rem;
-    color: white;
-    text-transform: uppercase;
-}
-.competition-low { background-color: #28a745; }
-.competition-medium { background-color: #ffc107; }
-.competition-high { background-color: #dc3545; }
-.competition-unknown { background-color: #6c757d; } 
-
-.metric-highlight {
-    font-size: 1.1rem;
-    font-weight: 600;
-    color: #007bff;
-}
-.related-keyword-tag {
-    display: inline-block;
-    background-color: #e9ecef;
-    color: #495057;
-    padding: 0.25rem 0.6rem;
-    margin: 0.2rem;
-    border-radius: 0.375rem;
-    font-size: 0.875rem;
-    border: 1px solid #ced4da;
-}
-.stExpander .stImage > img {
-    border-radius: 15px;
+    Fetch and extract related keywords for a topic, cached per topic.
+
+    Failed or empty lookups raise instead of returning, so they are never
+    cached and the retry loop in process_topic still reaches the API.
+    """
+    client = _get_dataforseo_client(login, password)
+    api_response = client.get_related_keywords(topic)
+    if not api_response:
+        raise ConnectionError(f"DataForSEO request failed for '{topic}'")
+
+    keywords_data = client.extract_keyword_data(api_response)
+    if not keywords_data:
+        raise LookupError(f"DataForSEO returned no related keywords for '{topic}'")
+    return keywords_data
+
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Event loop reused across reruns of the current session.
+
+    It is driven from the script thread rather than a shared background
+    thread because process_topic updates Streamlit elements, which only
+    works inside the session's own script run.
+    """
+    loop = st.session_state.get("_event_loop")
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        st.session_state["_event_loop"] = loop
+    return loop
+
+
+def _get_async_clients(config: Config) -> Tuple[LLMGenerator, TrendsAnalyzer]:
+    """
+    Gemini-backed clients reused across reruns of the current session.
+
+    Their async connection pools are bound to the loop they first run on,
+    so they live next to the session's event loop instead of being shared
+    between sessions.
+    """
+    clients = st.session_state.get("_async_clients")
+    if clients is None:
+        clients = (LLMGenerator(config), TrendsAnalyzer(config))
+        st.session_state["_async_clients"] = clients
+    return clients
+
+
+@st.cache_resource(show_spinner=False)
+def _results_store() -> Tuple[threading.Lock, OrderedDict]:
+    """
+    Server-side store for analysis results, so session state only has to
+    hold the key. Maps results keys to (last access, results), least
+    recently used first, behind a lock shared by every session.
+    """
+    return threading.Lock(), OrderedDict()
+
+
+def _expire_results(entries: OrderedDict, now: float):
+    """Drop entries idle for longer than CACHE_DURATION or beyond the cap"""
+    while entries:
+        last_access, _ = next(iter(entries.values()))
+        if now - last_access <= config.CACHE_DURATION:
+            break
+        entries.popitem(last=False)
+    while len(entries) > config.RESULTS_STORE_MAX_ENTRIES:
+        entries.popitem(last=False)
+
+
+def _store_results(results_key: str, results: Dict):
+    """Store results under ``results_key``"""
+    lock, entries = _results_store()
+    now = time.monotonic()
+    with lock:
+        entries[results_key] = (now, results)
+        entries.move_to_end(results_key)
+        _expire_results(entries, now)
+
+
+def _stored_results(results_key: str) -> Optional[Dict]:
+    """
+    Results stored under ``results_key``, or None once they have expired.
+    Expiry counts from the last access, so results being viewed stay alive.
+    """
+    lock, entries = _results_store()
+    now = time.monotonic()
+    with lock:
+        _expire_results(entries, now)
+        entry = entries.get(results_key)
+        if entry is None:
+            return None
+        entries[results_key] = (now, entry[1])
+        entries.move_to_end(results_key)
+        return entry[1]
+
+
+@st.cache_resource(show_spinner=False)
+def _topic_results() -> Dict[str, str]:
+    """Results key of the latest successful analysis for each topic"""
+    return {}
+
+
+def _clear_results_cache():
+    """Forget cached keyword lookups, analyses and stored results"""
+    credentials = config.get_dataforseo_credentials()
+    if credentials["login"] and credentials["password"]:
+        _get_dataforseo_client(**credentials).clear_cache()
+    _fetch_related_keywords.clear()
+    _build_keywords_df.clear()
+    _results_store.clear()
+    _topic_results().clear()
+
+
+def _topic_key(topic: str) -> str:
+    """Case- and whitespace-insensitive key for reusing a topic's results"""
+    return " ".join(topic.lower().split())
+
+
+def _results_key(results: Dict[str, Any]) -> str:
+    """Key identifying a single analysis run"""
+    return f"{results['topic']}|{results['timestamp']}"
+
+
+# Integer columns are narrowed with pd.to_numeric, which only downcasts when
+# every value fits, so a huge search volume can never wrap around
+_KEYWORDS_DF_INT_COLUMNS = ("search_volume", "keyword_difficulty")
+_KEYWORDS_DF_DTYPES = {
+    "cpc": "float32",
+    "low_top_of_page_bid": "float32",
+    "high_top_of_page_bid": "float32",
+    "competition_level": "category",
 }
-</style>
-""",
-    unsafe_allow_html=True,
-)
+
+
+@st.cache_data(ttl=config.CACHE_DURATION, show_spinner=False)
+def _build_keywords_df(results_id: str, _keywords: List[Dict]) -> pd.DataFrame:
+    """Build the keywords DataFrame once per analysis run, shared by all tabs"""
+    import pandas as pd
+
+    kw_df = pd.DataFrame(_keywords).fillna(
+        {"search_volume": 0, "keyword_difficulty": 0, "competition_level": "UNKNOWN"}
+    )
+    for column in _KEYWORDS_DF_INT_COLUMNS:
+        if column in kw_df.columns:
+            kw_df[column] = pd.to_numeric(
+                kw_df[column].astype("int64"), downcast="integer"
+            )
+    return kw_df.astype(
+        {
+            column: dtype
+            for column, dtype in _KEYWORDS_DF_DTYPES.items()
+            if column in kw_df.columns
+        }
+    )
+
+
+@st.cache_data(ttl=config.CACHE_DURATION, show_spinner=False)
+def _keywords_csv(
+    results_id: str, filters: Tuple[Any, ...], _filtered_df: pd.DataFrame
+) -> bytes:
+    """CSV export of the filtered keywords, cached per results set and filters"""
+    return _filtered_df.to_csv(index=False).encode("utf-8")
+
+
+@st.cache_data(ttl=config.CACHE_DURATION, show_spinner=False)
+def _top_keywords_df(
+    results_id: str, _kw_df: pd.DataFrame, n: int = 15
+) -> pd.DataFrame:
+    """Top keywords by search volume, ascending for the horizontal bar chart"""
+    return (
+        _kw_df[["keyword", "search_volume"]]
+        .nlargest(n, "search_volume")
+        .sort_values("search_volume", ascending=True)
+    )
+
+
+_AD_DEFAULT_HEADLINES = ["Your Awesome Product", "Special Offer Inside", "Shop Now"]
+_AD_DEFAULT_DESCRIPTION = "Get the best deals and top-rated service. Click here to learn more about our exclusive offers and find the perfect solution for your needs today."
+
+
+@st.cache_data(ttl=config.CACHE_DURATION, show_spinner=False)
+def _full_ad_preview_html(ad_copy_key: str, _ad_copy: Dict) -> str:
+    """Search ad preview HTML, cached on the serialized ad copy"""
+    headlines = _ad_copy.get("headlines", [])[:3]
+    descriptions = _ad_copy.get("descriptions", [])
+    # Ad copy is model output rendered with unsafe_allow_html, so escape it
+    display_path = escape(_ad_copy.get("display_path", ""))
+
+    headline_bar = escape(
+        " | ".join(h for h in headlines + _AD_DEFAULT_HEADLINES[len(headlines) :] if h)
+    )
+    full_description = escape(
+        " ".join(descriptions) if descriptions else _AD_DEFAULT_DESCRIPTION
+    )
+
+    return "".join(
+        [
+            '<div style="font-family: Arial, sans-serif; border: 1px solid #e0e0e0; border-radius: 8px; padding: 16px; margin: 10px 0; max-width: 600px; background-color: #ffffff;">',
+            '<div style="display: flex; align-items: center; margin-bottom: 4px;">',
+            '<span style="font-weight: bold; font-size: 14px; color: #202124;">Ad</span>',
+            '<span style="font-size: 14px; color: #5f6368; margin: 0 4px;">·</span>',
+            '<span style="font-size: 14px; color: #202124;">www.yourwebsite.com',
+            display_path,
+            "</span></div>",
+            '<h3 style="color: #1a0dab; font-size: 20px; font-weight: 400; margin: 0 0 4px 0; line-height: 1.3;">',
+            headline_bar,
+            "</h3>",
+            '<p style="font-size: 14px; color: #4d5156; line-height: 1.57; margin: 0;">',
+            full_description,
+            "</p></div>",
+        ]
+    )
+
+
+def _format_numbers(values: pd.Series) -> np.ndarray:
+    """Vectorized DataForSEOLabs.format_number for a column of counts"""
+    numbers = values.fillna(0).to_numpy(dtype=np.float64)
+    return np.select(
+        [numbers >= 1_000_000, numbers >= 1_000],
+        [
+            np.char.mod("%.1fM", numbers / 1_000_000),
+            np.char.mod("%.1fK", numbers / 1_000),
+        ],
+        default=np.char.mod("%d", numbers),
+    )
+
+
+def _format_currencies(values: pd.Series) -> np.ndarray:
+    """Vectorized DataForSEOLabs.format_currency for a column of amounts"""
+    return np.char.mod("$%.2f", values.fillna(0).to_numpy(dtype=np.float64))
 
 
 class KeywordsCampaignsApp:
     def __init__(self):
-        self.config = Config()
-        api_credentials = self.config.get_dataforseo_credentials()
-        if api_credentials["login"] and api_credentials["password"]:
-            self.dataforseo = DataForSEOLabs(
-                login=api_credentials["login"], password=api_credentials["password"]
-            )
-        else:
-            self.dataforseo = None
-        self.llm_generator = LLMGenerator(self.config)
-        self.trends_analyzer = TrendsAnalyzer(self.config)
+        self.config, self.dataforseo = _get_clients()
+
+    @property
+    def llm_generator(self) -> LLMGenerator:
+        """Campaign generator of the current session"""
+        return _get_async_clients(self.config)[0]
+
+    @property
+    def trends_analyzer(self) -> TrendsAnalyzer:
+        """Trends analyzer of the current session"""
+        return _get_async_clients(self.config)[1]
 
     def validate_api_keys(self) -> Dict[str, bool]:
         """Validate that required API keys are present"""
@@ -118,57 +382,114 @@ class KeywordsCampaignsApp:
             "campaigns": [],
             "analysis": {},
             "timestamp": datetime.now().isoformat(),
+            # Only runs that reach the final step may be reused for the topic
+            "complete": False,
         }
 
-        progress_bar = st.progress(0, text="Initializing...")
+        progress_bar = st.progress(20, text="🔍 Fetching related keywords...")
+        last_progress = 20
+
+        def update_progress(percent: int, text: str):
+            """Advance the progress bar, skipping updates that would not move it"""
+            nonlocal last_progress
+            if percent > last_progress:
+                progress_bar.progress(percent, text=text)
+                last_progress = percent
 
         try:
             keywords_data = []
-            api_response = None
+            api_failed = False
             max_retries = 3
             retry_delay = 4
+            credentials = self.config.get_dataforseo_credentials()
 
             for attempt in range(max_retries):
-                progress_text = f"🔍 Fetching related keywords..."
-                progress_bar.progress(20 + (attempt * 10), text=progress_text)
+                update_progress(
+                    20 + (attempt * 10),
+                    f"🔍 Fetching related keywords (attempt {attempt + 1}/{max_retries})...",
+                )
 
-                api_response = self.dataforseo.get_related_keywords(topic)
-                print(api_response)
-                if api_response:
-                    keywords_data = self.dataforseo.extract_keyword_data(api_response)
-                    if keywords_data:
-                        break
+                try:
+                    keywords_data = await asyncio.to_thread(
+                        _fetch_related_keywords,
+                        credentials["login"],
+                        credentials["password"],
+                        topic,
+                    )
+                    break
+                except ConnectionError:
+                    api_failed = True
+                except LookupError:
+                    api_failed = False
 
                 if attempt < max_retries - 1:
                     await asyncio.sleep(retry_delay)
 
-            if not api_response:
-                st.error(
-                    "Failed to fetch keywords. The API might be down or the request timed out."
-                )
-                progress_bar.empty()
-                return results
-
             if not keywords_data:
-                st.warning(
-                    "DataForSEO did not return any related keywords for this topic after several attempts. Try a different or broader topic."
-                )
+                if api_failed:
+                    st.error(
+                        "Failed to fetch keywords. The API might be down or the request timed out."
+                    )
+                else:
+                    st.warning(
+                        "DataForSEO did not return any related keywords for this topic after several attempts. Try a different or broader topic."
+                    )
                 progress_bar.empty()
                 return results
 
-            progress_bar.progress(50, text="📊 Processing keyword data...")
             results["keywords"] = keywords_data
-            results["analysis"] = self.dataforseo.get_keyword_analysis_data(
-                keywords_data
-            )
 
-            progress_bar.progress(75, text="🚀 Generating AI campaigns & images...")
-            campaigns = await self.llm_generator.generate_campaigns_from_keywords(
-                keywords_data, topic
+            # The analysis only needs the keyword list, so it runs in a worker
+            # thread while the campaign/image generation awaits the network.
+            analysis_task = asyncio.create_task(
+                asyncio.to_thread(
+                    DataForSEOLabs.get_keyword_analysis_data, keywords_data
+                )
             )
-            results["campaigns"] = campaigns
 
-            progress_bar.progress(100, text="✅ Analysis complete!")
+            update_progress(75, "🚀 Generating AI campaigns & images...")
+            # Finished campaigns are previewed as they arrive; the full
+            # results view replaces the preview once everything is done.
+            preview = st.empty()
+            preview_box = preview.container()
+            campaigns = []
+            try:
+                # Streamlit stops a rerun by raising out of the script, so close
+                # the stream explicitly rather than leave its image tasks on the
+                # session's event loop
+                async with aclosing(
+                    self.llm_generator.stream_campaigns_from_keywords(
+                        keywords_data, topic
+                    )
+                ) as campaign_stream:
+                    async for campaign in campaign_stream:
+                        campaigns.append(campaign)
+                        title = campaign.get("title", "Untitled")
+                        update_progress(
+                            min(95, 75 + 5 * len(campaigns)),
+                            f"🎨 Campaign {len(campaigns)} ready: {title}",
+                        )
+                        with preview_box:
+                            with st.expander(f"🎨 {title}"):
+                                image_path = campaign.get("image_path")
+                                if image_path and os.path.exists(image_path):
+                                    st.image(image_path, width=240)
+                                st.markdown(
+                                    f"**🎯 Objective:** {campaign.get('objective', 'N/A')}"
+                                )
+            finally:
+                preview.empty()
+                # A failed campaign run must not take the keyword analysis or
+                # the campaigns that did finish down with it
+                results["analysis"] = await analysis_task
+                # Campaigns arrive in image-completion order; show them in the
+                # order Gemini proposed them
+                results["campaigns"] = sorted(
+                    campaigns, key=lambda c: c.get("stream_index", 0)
+                )
+
+            update_progress(100, "✅ Analysis complete!")
+            results["complete"] = True
 
         except Exception as e:
             st.error(f"An unexpected error occurred during processing: {str(e)}")
@@ -176,10 +497,6 @@ class KeywordsCampaignsApp:
 
         return results
 
-    def get_competition_class(self, competition_level: str) -> str:
-        """Get CSS class for competition level"""
-        return f"competition-{competition_level.lower()}"
-
     def render_main_settings(self) -> Dict[str, Any]:
         """Render campaign settings in main area"""
         st.markdown("#### 📋 Inputs")
@@ -193,12 +510,16 @@ class KeywordsCampaignsApp:
                 placeholder="e.g., tyre dealers, insurance providers, digital marketing",
                 help="Enter the main topic to research. The tool will find related keywords and generate campaign ideas.",
             )
+            fresh = st.checkbox(
+                "Run a fresh analysis",
+                help="Ignore any recent analysis of this topic and generate new campaigns.",
+            )
         with col2:
             st.markdown("**Don't know what to search for?**")
             st.markdown(
                 ":rainbow-background[**Let the tool analyze current trending topics keywords for you!**]"
             )
-        return {"topic": topic}
+        return {"topic": topic, "fresh": fresh}
 
     def render_sidebar(self):
         """Render sidebar with help information"""
@@ -239,12 +560,26 @@ class KeywordsCampaignsApp:
         """
         )
 
-    def render_keywords_tab(self, keywords: List[Dict]):
+        if st.sidebar.button("🧹 Clear cache", use_container_width=True):
+            _clear_results_cache()
+            st.session_state.pop("results_ref", None)
+            st.sidebar.success("Cached results cleared.")
+
+    def render_keywords_tab(
+        self, keywords: List[Dict], kw_df: pd.DataFrame, results_id: str
+    ):
         """Render keywords analysis tab"""
         if not keywords:
             st.warning("No keywords found to display.")
             return
 
+        self._keywords_fragment(keywords, kw_df, results_id)
+
+    @st.fragment
+    def _keywords_fragment(
+        self, keywords: List[Dict], kw_df: pd.DataFrame, results_id: str
+    ):
+        """Keyword filters and listing; filter changes rerun only this part"""
         with st.expander("🔑 Keyword Details & Filters", expanded=False):
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -258,114 +593,124 @@ class KeywordsCampaignsApp:
                     "Filter by Competition Level", ["ALL", "LOW", "MEDIUM", "HIGH"]
                 )
 
-        filtered_keywords = [
-            kw
-            for kw in keywords
-            if (kw.get("keyword_difficulty", 0) or 0) <= difficulty_filter
-            and (kw.get("search_volume", 0) or 0) >= min_volume_filter
-            and (
-                competition_filter == "ALL"
-                or kw.get("competition_level", "").upper() == competition_filter
+        # Reruns that do not touch the filters (toggles, paging, downloads)
+        # reuse the last filtered frame for this results set
+        filters = (difficulty_filter, min_volume_filter, competition_filter)
+        if st.session_state.get("_kw_filter_key") != (results_id, filters):
+            mask = (kw_df["keyword_difficulty"] <= difficulty_filter) & (
+                kw_df["search_volume"] >= min_volume_filter
             )
-        ]
-
-        st.markdown(f"**Showing {len(filtered_keywords)} of {len(keywords)} keywords**")
+            if competition_filter != "ALL":
+                mask &= kw_df["competition_level"] == competition_filter
+            st.session_state["_kw_filtered"] = kw_df[mask]
+            st.session_state["_kw_filter_key"] = (results_id, filters)
+        filtered_df = st.session_state["_kw_filtered"]
+
+        st.markdown(f"**Showing {len(filtered_df)} of {len(keywords)} keywords**")
+        st.download_button(
+            "📥 Download CSV",
+            data=_keywords_csv(results_id, filters, filtered_df),
+            file_name=st.session_state["_csv_filename"],
+            mime="text/csv",
+        )
 
-        for keyword in filtered_keywords:
-            with st.container():
-                st.markdown(
-                    f"""
-                    <div class="keyword-card">
-                        <div class="keyword-title">"{keyword.get("keyword", "N/A")}"</div>
-                    """,
-                    unsafe_allow_html=True,
+        card_view = st.toggle(
+            "Card view",
+            value=False,
+            help="Show each keyword as a detailed card instead of a table.",
+        )
+        if not card_view:
+            st.dataframe(
+                filtered_df[
+                    [
+                        "keyword",
+                        "search_volume",
+                        "cpc",
+                        "keyword_difficulty",
+                        "competition_level",
+                        "low_top_of_page_bid",
+                        "high_top_of_page_bid",
+                    ]
+                ],
+                column_config={
+                    "keyword": st.column_config.TextColumn("Keyword"),
+                    "search_volume": st.column_config.NumberColumn(
+                        "📊 Search Volume", format="%d"
+                    ),
+                    "cpc": st.column_config.NumberColumn("💰 Avg. CPC", format="$%.2f"),
+                    "keyword_difficulty": st.column_config.ProgressColumn(
+                        "🎯 SEO Difficulty", min_value=0, max_value=100, format="%d"
+                    ),
+                    "competition_level": st.column_config.TextColumn("Competition"),
+                    "low_top_of_page_bid": st.column_config.NumberColumn(
+                        "💵 Low Top of Page Bid", format="$%.2f"
+                    ),
+                    "high_top_of_page_bid": st.column_config.NumberColumn(
+                        "💵 High Top of Page Bid", format="$%.2f"
+                    ),
+                },
+                height=600,
+                hide_index=True,
+                use_container_width=True,
+            )
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                page_size = st.selectbox("Cards per page", [20, 50, 100])
+            total_pages = max(1, math.ceil(len(filtered_df) / page_size))
+            with col2:
+                page = st.number_input(
+                    f"Page (of {total_pages})",
+                    min_value=1,
+                    max_value=total_pages,
+                    value=1,
+                    step=1,
                 )
 
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric(
-                        "📊 Search Volume",
-                        self.dataforseo.format_number(keyword.get("search_volume", 0)),
-                    )
-                with col2:
-                    st.metric(
-                        "💰 Avg. CPC",
-                        self.dataforseo.format_currency(keyword.get("cpc", 0)),
-                    )
-                with col3:
-                    st.metric(
-                        "🎯 SEO Difficulty",
-                        f"{keyword.get('keyword_difficulty', 0)}/100",
-                    )
-
-                col4, col5 = st.columns([1, 2])
-                with col4:
-                    competition_level = keyword.get("competition_level", "UNKNOWN")
-                    comp_class = self.get_competition_class(competition_level)
-                    st.markdown(
-                        f'**Competition** <span class="competition-label {comp_class}">{competition_level}</span>',
-                        unsafe_allow_html=True,
-                    )
-                with col5:
-                    low_bid = self.dataforseo.format_currency(
-                        keyword.get("low_top_of_page_bid", 0)
-                    )
-                    high_bid = self.dataforseo.format_currency(
-                        keyword.get("high_top_of_page_bid", 0)
-                    )
-                    st.metric("💵 Est. Top of Page Bid", f"{low_bid} - {high_bid}")
-
-                related_keywords = keyword.get("related_keywords", [])
-                if related_keywords:
-                    with st.expander(f"🔗 Related Ideas"):
-                        related_html = "".join(
-                            [
-                                f'<span class="related-keyword-tag">{kw}</span>'
-                                for kw in related_keywords[:25]
-                            ]
-                        )
-                        st.markdown(
-                            f"<div>{related_html}</div>", unsafe_allow_html=True
-                        )
-
-                st.markdown("</div>", unsafe_allow_html=True)
-
-        if filtered_keywords:
-            df = pd.DataFrame(filtered_keywords)
-            csv = df.to_csv(index=False).encode("utf-8")
+            page_df = filtered_df.iloc[(page - 1) * page_size : page * page_size]
+            cards = [
+                self._keyword_card_html(keyword, volume, cpc, low_bid, high_bid)
+                for keyword, volume, cpc, low_bid, high_bid in zip(
+                    (keywords[i] for i in page_df.index),
+                    _format_numbers(page_df["search_volume"]),
+                    _format_currencies(page_df["cpc"]),
+                    _format_currencies(page_df["low_top_of_page_bid"]),
+                    _format_currencies(page_df["high_top_of_page_bid"]),
+                )
+            ]
+            st.markdown("".join(cards), unsafe_allow_html=True)
+
+    def _keyword_card_html(
+        self, keyword: Dict, volume: str, cpc: str, low_bid: str, high_bid: str
+    ) -> str:
+        """Build the HTML for a single keyword card from pre-formatted metrics"""
+        competition_level = keyword.get("competition_level", "UNKNOWN")
+        comp_class = COMPETITION_CLASSES.get(competition_level, "competition-unknown")
+
+        related_html = ""
+        related_keywords = keyword.get("related_keywords", [])
+        if related_keywords:
+            tags = "".join(
+                _RELATED_TAG_OPEN + escape(kw) + _RELATED_TAG_CLOSE
+                for kw in related_keywords[:25]
+            )
+            related_html = f"<details><summary>🔗 Related Ideas</summary><div>{tags}</div></details>"
+
+        return _KEYWORD_CARD_TEMPLATE.substitute(
+            keyword=escape(keyword.get("keyword", "N/A")),
+            volume=volume,
+            cpc=cpc,
+            difficulty=keyword.get("keyword_difficulty", 0),
+            comp_class=comp_class,
+            competition_level=competition_level,
+            low_bid=low_bid,
+            high_bid=high_bid,
+            related_html=related_html,
+        )
 
     def render_full_ad_preview(self, ad_copy: Dict) -> str:
         """Generates a realistic HTML preview of a search ad."""
-        headlines = ad_copy.get("headlines", [])
-        descriptions = ad_copy.get("descriptions", [])
-        display_path = ad_copy.get("display_path", "")
-
-        h1 = headlines[0] if len(headlines) > 0 else "Your Awesome Product"
-        h2 = headlines[1] if len(headlines) > 1 else "Special Offer Inside"
-        h3 = headlines[2] if len(headlines) > 2 else "Shop Now"
-
-        full_description = (
-            " ".join(descriptions)
-            if descriptions
-            else "Get the best deals and top-rated service. Click here to learn more about our exclusive offers and find the perfect solution for your needs today."
-        )
-
-        full_ad_html = f"""
-        <div style="font-family: Arial, sans-serif; border: 1px solid #e0e0e0; border-radius: 8px; padding: 16px; margin: 10px 0; max-width: 600px; background-color: #ffffff;">
-            <div style="display: flex; align-items: center; margin-bottom: 4px;">
-                <span style="font-weight: bold; font-size: 14px; color: #202124;">Ad</span>
-                <span style="font-size: 14px; color: #5f6368; margin: 0 4px;">·</span>
-                <span style="font-size: 14px; color: #202124;">www.yourwebsite.com{display_path}</span>
-            </div>
-            <h3 style="color: #1a0dab; font-size: 20px; font-weight: 400; margin: 0 0 4px 0; line-height: 1.3;">
-                {' | '.join([h for h in [h1, h2, h3] if h])}
-            </h3>
-            <p style="font-size: 14px; color: #4d5156; line-height: 1.57; margin: 0;">
-                {full_description}
-            </p>
-        </div>
-        """
-        return full_ad_html
+        return _full_ad_preview_html(json.dumps(ad_copy, sort_keys=True), ad_copy)
 
     def render_campaigns_tab(self, campaigns: List[Dict]):
         """Render campaigns tab"""
@@ -407,10 +752,9 @@ class KeywordsCampaignsApp:
                 col1, col2 = st.columns(2)
                 with col1:
                     if campaign.get("keywords"):
-                        st.markdown("**🔑 Target Keywords**")
-                        st.dataframe(
-                            pd.DataFrame(campaign["keywords"], columns=["Keyword"]),
-                            use_container_width=True,
+                        st.markdown(
+                            "**🔑 Target Keywords**\n\n"
+                            + "\n".join(f"- {kw}" for kw in campaign["keywords"])
                         )
 
                 with col2:
@@ -431,12 +775,9 @@ class KeywordsCampaignsApp:
                                     else "Example description..."
                                 )
 
-                                ad_preview_html = f"""
-                                <div style="padding: 5px 5px 0 5px;">
-                                    <p style="font-size: 1.1em; color: #1a0dab; font-weight: bold; margin: 0;">{h1}</p>
-                                    <p style="color: #545454; margin-top: 5px; margin-bottom: 5px;">{d1}</p>
-                                </div>
-                                """
+                                ad_preview_html = _AD_PREVIEW_TEMPLATE.render(
+                                    headline=h1, description=d1
+                                )
                                 st.markdown(ad_preview_html, unsafe_allow_html=True)
 
                                 popover = st.popover(
@@ -451,20 +792,27 @@ class KeywordsCampaignsApp:
 
                                     st.markdown("##### :rainbow-background[Components]")
                                     st.markdown("**Headlines:**")
-                                    for h in headlines:
-                                        st.info(h)
+                                    if headlines:
+                                        st.info("\n".join(f"- {h}" for h in headlines))
 
                                     st.markdown("**Descriptions:**")
-                                    for d in descriptions:
-                                        st.info(d)
+                                    if descriptions:
+                                        st.info(
+                                            "\n".join(f"- {d}" for d in descriptions)
+                                        )
                         else:
                             st.info("No ad copy generated for this campaign.")
 
-    def render_analysis_tab(self, analysis: Dict, keywords: List[Dict]):
+    def render_analysis_tab(
+        self, analysis: Dict, kw_df: pd.DataFrame, top_keywords: pd.DataFrame
+    ):
         """Render analysis tab with charts and insights"""
+        import plotly.express as px
+        import plotly.graph_objects as go
+
         st.markdown("### :green-background[Overview]")
 
-        if not keywords or not analysis:
+        if kw_df.empty or not analysis:
             st.warning("No data available for analysis.")
             return
 
@@ -492,44 +840,39 @@ class KeywordsCampaignsApp:
         with col1:
             st.markdown("#### :rainbow-background[Competition Distribution]")
             if analysis.get("competition_counts"):
-                comp_df = pd.DataFrame(
-                    list(analysis["competition_counts"].items()),
-                    columns=["Competition Level", "Count"],
-                ).sort_values("Competition Level")
-                fig = px.pie(
-                    comp_df,
-                    values="Count",
-                    names="Competition Level",
-                    title="",
-                    color="Competition Level",
-                    color_discrete_map={
-                        "LOW": "#28a745",
-                        "MEDIUM": "#ffc107",
-                        "HIGH": "#dc3545",
-                        "UNKNOWN": "#6c757d",
-                    },
+                competition_counts = analysis["competition_counts"]
+                levels = sorted(competition_counts)
+                fig = go.Figure(
+                    go.Pie(
+                        labels=levels,
+                        values=[competition_counts[level] for level in levels],
+                        marker_colors=[
+                            COMPETITION_COLORS.get(level, "#6c757d") for level in levels
+                        ],
+                    )
                 )
                 st.plotly_chart(fig, use_container_width=True)
 
         with col2:
             st.markdown("#### :rainbow-background[Search Volume vs. CPC]")
-            if keywords:
-                kw_df = pd.DataFrame(keywords)
+            if not kw_df.empty:
                 if "search_volume" in kw_df.columns and "cpc" in kw_df.columns:
+                    # Zero volumes cannot be placed on the log axis, so
+                    # leave them out of the payload sent to the browser
+                    plot_df = kw_df.loc[
+                        kw_df["search_volume"] > 0,
+                        ["search_volume", "cpc", "keyword", "competition_level"],
+                    ]
                     fig = px.scatter(
-                        kw_df,
+                        plot_df,
                         x="search_volume",
                         y="cpc",
                         hover_data=["keyword", "competition_level"],
                         color="competition_level",
-                        color_discrete_map={
-                            "LOW": "#28a745",
-                            "MEDIUM": "#ffc107",
-                            "HIGH": "#dc3545",
-                            "UNKNOWN": "#6c757d",
-                        },
+                        color_discrete_map=COMPETITION_COLORS,
                         title="",
                         log_x=True,
+                        render_mode="webgl",
                     )
                     fig.update_layout(
                         xaxis_title="Search Volume (Log Scale)",
@@ -537,13 +880,9 @@ class KeywordsCampaignsApp:
                     )
                     st.plotly_chart(fig, use_container_width=True)
 
-        if keywords:
+        if not kw_df.empty:
             st.markdown("#### :rainbow-background[Top Keywords by Search Volume]")
-            kw_df = pd.DataFrame(keywords)
-            if "search_volume" in kw_df.columns:
-                top_keywords = kw_df.nlargest(15, "search_volume").sort_values(
-                    "search_volume", ascending=True
-                )
+            if not top_keywords.empty:
                 fig = px.bar(
                     top_keywords,
                     x="search_volume",
@@ -566,25 +905,78 @@ class KeywordsCampaignsApp:
         st.markdown(f"#### 📊 Results for '{results['topic']}'")
 
         tab1, tab2, tab3 = st.tabs(["🔑 Keywords", "🚀 Campaign Ideas", "📈 Analysis"])
+        results_id = _results_key(results)
+        kw_df = _build_keywords_df(results_id, results["keywords"])
+        # Name the export once per results set so it stays stable across reruns
+        if st.session_state.get("_csv_filename_key") != results_id:
+            st.session_state["_csv_filename"] = time.strftime(
+                "keywords_%Y%m%d_%H%M%S.csv"
+            )
+            st.session_state["_csv_filename_key"] = results_id
 
         with tab1:
-            self.render_keywords_tab(results["keywords"])
+            self.render_keywords_tab(results["keywords"], kw_df, results_id)
 
         with tab2:
             self.render_campaigns_tab(results["campaigns"])
 
         with tab3:
-            self.render_analysis_tab(results["analysis"], results["keywords"])
+            self.render_analysis_tab(
+                results["analysis"], kw_df, _top_keywords_df(results_id, kw_df)
+            )
+
+    def analyze_topic(
+        self, topic: str, fresh: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Run process_topic, reusing a recent successful analysis of the topic"""
+        topic_key = _topic_key(topic)
+        results_key = None if fresh else _topic_results().get(topic_key)
+        if results_key:
+            results = _stored_results(results_key)
+            if results:
+                return results
+            _topic_results().pop(topic_key, None)
+
+        loop = _get_event_loop()
+        try:
+            return loop.run_until_complete(self.process_topic(topic))
+        finally:
+            # Let tasks cancelled by an interrupted run finish cancelling now,
+            # instead of lingering on the loop until the next analysis
+            leftover = asyncio.all_tasks(loop)
+            for task in leftover:
+                task.cancel()
+            if leftover:
+                loop.run_until_complete(
+                    asyncio.gather(*leftover, return_exceptions=True)
+                )
+
+    def save_results(self, topic: str, results: Dict[str, Any]):
+        """Store results server-side and keep only a reference in session state"""
+        results_key = _results_key(results)
+        # Reused runs may come from another spelling of the topic or another
+        # user, so the results view says where they came from
+        reused = _topic_results().get(_topic_key(topic)) == results_key
+        _store_results(results_key, results)
+        # Failed or partial runs are still shown, but never reused for the topic
+        if results.get("complete"):
+            _topic_results()[_topic_key(topic)] = results_key
+        st.session_state["results_ref"] = {
+            "key": results_key,
+            "topic": topic,
+            "reused": reused,
+        }
 
     def run(self):
         """Main application runner"""
+        # Streamlit drops elements that are not re-sent, so the (cached)
+        # stylesheet still has to be emitted on every run.
+        st.markdown(_css(), unsafe_allow_html=True)
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
-            if os.path.exists("resources/logo.png"):
-                st.image(
-                    "resources/logo.png",
-                    use_container_width=True,
-                )
+            logo = _logo()
+            if logo:
+                st.image(logo, use_container_width=True)
         self.render_sidebar()
         inputs = self.render_main_settings()
 
@@ -601,13 +993,14 @@ class KeywordsCampaignsApp:
                 use_container_width=True,
             ):
                 if "topic" in st.session_state and st.session_state["topic"]:
-                    if "results" in st.session_state:
-                        del st.session_state["results"]
+                    st.session_state.pop("results_ref", None)
 
-                    results = asyncio.run(self.process_topic(st.session_state["topic"]))
+                    results = self.analyze_topic(
+                        st.session_state["topic"], fresh=inputs["fresh"]
+                    )
 
                     if results and results.get("keywords"):
-                        st.session_state["results"] = results
+                        self.save_results(st.session_state["topic"], results)
                     else:
                         st.error(
                             "Analysis could not be completed. Please check the topic and try again."
@@ -622,13 +1015,20 @@ class KeywordsCampaignsApp:
                 use_container_width=True,
                 disabled=not search_api_available,
             ):
-                if "results" in st.session_state:
-                    del st.session_state["results"]
+                st.session_state.pop("results_ref", None)
                 if "suggested_topics" in st.session_state:
                     del st.session_state["suggested_topics"]
 
-                st.session_state["fetch_trending_topics"] = True
-                st.rerun()
+                with st.spinner("Analyzing Google Trends to find hot topics..."):
+                    suggested_topics = _get_event_loop().run_until_complete(
+                        self.trends_analyzer.get_promising_topics()
+                    )
+                if suggested_topics:
+                    st.session_state["suggested_topics"] = suggested_topics
+                else:
+                    st.error(
+                        "Could not fetch or analyze trending topics. Please try again later."
+                    )
 
             if (
                 "suggested_topics" in st.session_state
@@ -666,45 +1066,52 @@ class KeywordsCampaignsApp:
                                 del st.session_state["suggested_topics"]
                                 st.rerun()
 
-        if st.session_state.get("fetch_trending_topics"):
-            st.session_state["fetch_trending_topics"] = False
-            with st.spinner("Analyzing Google Trends to find hot topics..."):
-                suggested_topics = asyncio.run(
-                    self.trends_analyzer.get_promising_topics()
-                )
-            if suggested_topics:
-                st.session_state["suggested_topics"] = suggested_topics
-            else:
-                st.error(
-                    "Could not fetch or analyze trending topics. Please try again later."
-                )
-            st.rerun()
-
         if st.session_state.get("auto_run_analysis") and st.session_state.get("topic"):
             st.session_state.pop("auto_run_analysis", None)
-            if "results" in st.session_state:
-                del st.session_state["results"]
+            st.session_state.pop("results_ref", None)
 
-            results = asyncio.run(self.process_topic(st.session_state["topic"]))
+            results = self.analyze_topic(st.session_state["topic"])
 
             if results and results.get("keywords"):
-                st.session_state["results"] = results
+                self.save_results(st.session_state["topic"], results)
             else:
                 st.error(
                     "Analysis could not be completed. Please check the topic and try again."
                 )
 
-        if "results" in st.session_state:
-            if st.session_state.get("topic") == st.session_state["results"].get(
-                "topic"
-            ):
-                self.render_results(st.session_state["results"])
+        if "results_ref" in st.session_state:
+            results_ref = st.session_state["results_ref"]
+            if st.session_state.get("topic") == results_ref["topic"]:
+                results = _stored_results(results_ref["key"])
+                if results is None:
+                    st.session_state.pop("results_ref", None)
+                    st.info(
+                        f"⌛ The results for \"{results_ref['topic']}\" have expired. "
+                        "Click 'Analyze & Generate Campaigns' to run the analysis again."
+                    )
+                else:
+                    if results_ref.get("reused"):
+                        st.info(
+                            f"♻️ Showing the analysis of \"{results['topic']}\" from "
+                            f"{results['timestamp'][:16].replace('T', ' ')}. Tick "
+                            "'Run a fresh analysis' to generate new campaigns."
+                        )
+                    self.render_results(results)
         elif "topic" not in st.session_state or not st.session_state["topic"]:
             st.info(
                 "👆 Please enter a topic above and click 'Analyze', or click 'Search Trends' for AI-suggested topics."
             )
 
 
+@st.cache_resource(show_spinner=False)
+def get_app() -> KeywordsCampaignsApp:
+    """
+    App instance shared by every session and rerun. It holds no per-session
+    state; the session's Gemini clients are looked up on access.
+    """
+    return KeywordsCampaignsApp()
+
+
 if __name__ == "__main__":
-    app = KeywordsCampaignsApp()
+    app = get_app()
     app.run()
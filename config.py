@@ -1,60 +1,105 @@
+import functools
 import os
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, ClassVar, Dict, List, Mapping, Optional
 
 from dotenv import load_dotenv
 
-load_dotenv()
+# Deployments that inject real environment variables can set SKIP_DOTENV=1
+# to skip searching for and parsing a .env file at startup
+if os.environ.get("SKIP_DOTENV") != "1":
+    load_dotenv()
 
+# Settings are read once at import, after .env is loaded, so work from a plain
+# dict snapshot rather than going back to os.environ for every field
+_env = os.environ.copy()
 
-class Config:
-    """Central configuration management"""
 
-    APP_NAME = "Keywords & Campaigns"
-    VERSION = "1.1.0"
-    DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+def _int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    return int(_env.get(name, default))
 
-    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-    GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest")
-    GEMINI_IMAGE_MODEL = os.getenv(
-        "GEMINI_IMAGE_MODEL", "gemini-2.0-flash-preview-image-generation"
-    )
 
-    DATAFORSEO_LOGIN = os.getenv("DATAFORSEO_LOGIN")
-    DATAFORSEO_PASSWORD = os.getenv("DATAFORSEO_PASSWORD")
-    SEARCHAPI_KEY = os.getenv("SEARCHAPI_KEY")
+def _float(name: str, default: float) -> float:
+    """Read a float setting from the environment"""
+    return float(_env.get(name, default))
 
-    RATE_LIMITS = {
-        "dataforseo": int(os.getenv("RATE_LIMIT_DATAFORSEO", 60)),
-        "gemini": int(os.getenv("RATE_LIMIT_GEMINI", 60)),
-    }
 
-    DEFAULT_LOCATION = int(os.getenv("DEFAULT_LOCATION", 2840))
-    DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "en")
-    DEFAULT_CURRENCY = os.getenv("DEFAULT_CURRENCY", "USD")
+def _bool(name: str, default: str) -> bool:
+    """Read a "true"/"false" setting from the environment"""
+    return _env.get(name, default).lower() == "true"
+
 
-    CACHE_DURATION = int(os.getenv("CACHE_DURATION", 3600))
+# eq=False keeps identity hashing, so instance methods can be lru_cached
+@dataclass(frozen=True, slots=True, eq=False)
+class Config:
+    """Central configuration management"""
 
-    DATAFORSEO_DEPTH = int(os.getenv("DATAFORSEO_DEPTH", 3))
-    DATAFORSEO_LIMIT = int(os.getenv("DATAFORSEO_LIMIT", 100))
-    INCLUDE_SEED_KEYWORD = os.getenv("INCLUDE_SEED_KEYWORD", "false").lower() == "true"
-    INCLUDE_SERP_INFO = os.getenv("INCLUDE_SERP_INFO", "true").lower() == "true"
+    APP_NAME: str = "Keywords & Campaigns"
+    VERSION: str = "1.1.0"
+    DEBUG: bool = _bool("DEBUG", "False")
 
-    MAX_KEYWORDS_PER_REQUEST = int(os.getenv("MAX_KEYWORDS_PER_REQUEST", 50))
-    MAX_TOTAL_KEYWORDS = int(os.getenv("MAX_TOTAL_KEYWORDS", 100))
-    MIN_KEYWORD_LENGTH = int(os.getenv("MIN_KEYWORD_LENGTH", 2))
-    MAX_KEYWORD_LENGTH = int(os.getenv("MAX_KEYWORD_LENGTH", 10))
+    GEMINI_API_KEY: Optional[str] = _env.get("GEMINI_API_KEY")
+    GEMINI_MODEL: str = _env.get("GEMINI_MODEL", "gemini-1.5-flash-latest")
+    GEMINI_IMAGE_MODEL: str = _env.get(
+        "GEMINI_IMAGE_MODEL", "gemini-2.0-flash-preview-image-generation"
+    )
 
-    MAX_CAMPAIGNS = int(os.getenv("MAX_CAMPAIGNS", 5))
-    MAX_AD_COPIES_PER_CAMPAIGN = int(os.getenv("MAX_AD_COPIES_PER_CAMPAIGN", 3))
+    DATAFORSEO_LOGIN: Optional[str] = _env.get("DATAFORSEO_LOGIN")
+    DATAFORSEO_PASSWORD: Optional[str] = _env.get("DATAFORSEO_PASSWORD")
+    SEARCHAPI_KEY: Optional[str] = _env.get("SEARCHAPI_KEY")
 
-    OPPORTUNITY_WEIGHTS = {
-        "volume": float(os.getenv("WEIGHT_VOLUME", 0.3)),
-        "cpc": float(os.getenv("WEIGHT_CPC", 0.2)),
-        "difficulty": float(os.getenv("WEIGHT_DIFFICULTY", 0.3)),
-        "intent": float(os.getenv("WEIGHT_INTENT", 0.2)),
-    }
+    RATE_LIMITS: Dict[str, int] = field(
+        default_factory=lambda: {
+            "dataforseo": _int("RATE_LIMIT_DATAFORSEO", 60),
+            "gemini": _int("RATE_LIMIT_GEMINI", 60),
+        }
+    )
+    # Requests allowed back to back before the per-minute rate applies
+    RATE_LIMIT_BURSTS: Dict[str, int] = field(
+        default_factory=lambda: {
+            "gemini": _int("RATE_LIMIT_BURST_GEMINI", 10),
+        }
+    )
+
+    DEFAULT_LOCATION: int = _int("DEFAULT_LOCATION", 2840)
+    DEFAULT_LANGUAGE: str = _env.get("DEFAULT_LANGUAGE", "en")
+    DEFAULT_CURRENCY: str = _env.get("DEFAULT_CURRENCY", "USD")
+
+    CACHE_DURATION: int = _int("CACHE_DURATION", 3600)
+    # Analyses kept server-side across all users; size it for the number of
+    # concurrent users so one user's results are not evicted by others
+    RESULTS_STORE_MAX_ENTRIES: int = _int("RESULTS_STORE_MAX_ENTRIES", 200)
+    DATAFORSEO_CACHE_DIR: str = _env.get("DATAFORSEO_CACHE_DIR", ".dataforseo_cache")
+    DATAFORSEO_CACHE_MAX_ENTRIES: int = _int("DATAFORSEO_CACHE_MAX_ENTRIES", 256)
+
+    DATAFORSEO_DEPTH: int = _int("DATAFORSEO_DEPTH", 3)
+    DATAFORSEO_LIMIT: int = _int("DATAFORSEO_LIMIT", 100)
+    INCLUDE_SEED_KEYWORD: bool = _bool("INCLUDE_SEED_KEYWORD", "false")
+    INCLUDE_SERP_INFO: bool = _bool("INCLUDE_SERP_INFO", "true")
+
+    MAX_KEYWORDS_PER_REQUEST: int = _int("MAX_KEYWORDS_PER_REQUEST", 50)
+    MAX_TOTAL_KEYWORDS: int = _int("MAX_TOTAL_KEYWORDS", 100)
+    MIN_KEYWORD_LENGTH: int = _int("MIN_KEYWORD_LENGTH", 2)
+    MAX_KEYWORD_LENGTH: int = _int("MAX_KEYWORD_LENGTH", 10)
+
+    MAX_CAMPAIGNS: int = _int("MAX_CAMPAIGNS", 5)
+    MAX_AD_COPIES_PER_CAMPAIGN: int = _int("MAX_AD_COPIES_PER_CAMPAIGN", 3)
+
+    OPPORTUNITY_WEIGHTS: Dict[str, float] = field(
+        default_factory=lambda: {
+            "volume": _float("WEIGHT_VOLUME", 0.3),
+            "cpc": _float("WEIGHT_CPC", 0.2),
+            "difficulty": _float("WEIGHT_DIFFICULTY", 0.3),
+            "intent": _float("WEIGHT_INTENT", 0.2),
+        }
+    )
 
-    INTENT_KEYWORDS = {
+    LOG_LEVEL: str = _env.get("LOG_LEVEL", "INFO")
+    LOG_FILE: str = _env.get("LOG_FILE", "keywords_campaigns.log")
+
+    INTENT_KEYWORDS: ClassVar[Dict[str, List[str]]] = {
         "Commercial": [
             "buy",
             "purchase",
@@ -123,56 +168,59 @@ class Config:
         ],
     }
 
-    STREAMLIT_CONFIG = {
+    STREAMLIT_CONFIG: ClassVar[Dict[str, str]] = {
         "page_title": APP_NAME,
         "page_icon": "🔍",
         "layout": "wide",
         "initial_sidebar_state": "expanded",
     }
 
-    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-    LOG_FILE = os.getenv("LOG_FILE", "keywords_campaigns.log")
-
-    @classmethod
-    def get_api_status(cls) -> Dict[str, bool]:
+    @functools.lru_cache(maxsize=1)
+    def _api_state(self) -> Mapping[str, bool]:
+        """
+        Which API credentials are configured, checked once for all callers.
+        Read-only because every caller shares it; the public helpers below
+        build fresh containers from it that callers are free to modify.
+        """
+        return MappingProxyType(
+            {
+                "gemini": bool(self.GEMINI_API_KEY),
+                "dataforseo": bool(self.DATAFORSEO_LOGIN and self.DATAFORSEO_PASSWORD),
+                "searchapi": bool(self.SEARCHAPI_KEY),
+            }
+        )
+
+    def get_api_status(self) -> Dict[str, bool]:
         """Get status of all API configurations"""
+        state = self._api_state()
         return {
-            "Gemini API": bool(cls.GEMINI_API_KEY),
-            "DataForSEO Labs": bool(cls.DATAFORSEO_LOGIN and cls.DATAFORSEO_PASSWORD),
-            "SearchAPI": bool(cls.SEARCHAPI_KEY),
+            "Gemini API": state["gemini"],
+            "DataForSEO Labs": state["dataforseo"],
+            "SearchAPI": state["searchapi"],
         }
 
-    @classmethod
-    def get_available_apis(cls) -> list:
+    def get_available_apis(self) -> list:
         """Get list of available API services"""
-        apis = []
-        if cls.GEMINI_API_KEY:
-            apis.append("gemini")
-        if cls.DATAFORSEO_LOGIN and cls.DATAFORSEO_PASSWORD:
-            apis.append("dataforseo")
-        return apis
-
-    @classmethod
-    def get_dataforseo_credentials(cls) -> Dict[str, str]:
+        state = self._api_state()
+        return [api for api in ("gemini", "dataforseo") if state[api]]
+
+    def get_dataforseo_credentials(self) -> Dict[str, str]:
         """Get DataForSEO API credentials"""
         return {
-            "login": cls.DATAFORSEO_LOGIN or "",
-            "password": cls.DATAFORSEO_PASSWORD or "",
+            "login": self.DATAFORSEO_LOGIN or "",
+            "password": self.DATAFORSEO_PASSWORD or "",
         }
 
-    @classmethod
-    def validate_config(cls) -> Dict[str, Any]:
+    def validate_config(self) -> Dict[str, Any]:
         """Validate configuration and return status"""
+        state = self._api_state()
         status = {"valid": True, "errors": [], "warnings": [], "api_count": 0}
 
-        if not cls.GEMINI_API_KEY:
+        if not state["gemini"]:
             status["errors"].append("Gemini API key is required")
             status["valid"] = False
 
-        api_count = 0
-        if cls.DATAFORSEO_LOGIN and cls.DATAFORSEO_PASSWORD:
-            api_count += 1
-
+        api_count = int(state["dataforseo"])
         status["api_count"] = api_count
 
         if api_count == 0:
@@ -180,50 +228,50 @@ class Config:
                 "No keyword research APIs configured. System will use fallback methods with limited accuracy."
             )
 
-        if cls.MAX_KEYWORDS_PER_REQUEST <= 0:
+        if self.MAX_KEYWORDS_PER_REQUEST <= 0:
             status["errors"].append("MAX_KEYWORDS_PER_REQUEST must be positive")
             status["valid"] = False
 
-        if cls.CACHE_DURATION < 0:
+        if self.CACHE_DURATION < 0:
             status["errors"].append("CACHE_DURATION cannot be negative")
             status["valid"] = False
 
         return status
 
-    @classmethod
-    def get_config_summary(cls) -> str:
+    @functools.lru_cache(maxsize=1)
+    def get_config_summary(self) -> str:
         """Get human-readable configuration summary"""
-        api_status = cls.get_api_status()
-        validation = cls.validate_config()
+        api_status = self.get_api_status()
+        validation = self.validate_config()
 
         summary = f"""
-        🔍 {cls.APP_NAME} v{cls.VERSION} Configuration Summary
+        🔍 {self.APP_NAME} v{self.VERSION} Configuration Summary
 
         📊 API Status:
-        {''.join([f"  {'✅' if status else '❌'} {name}" for name, status in api_status.items()])}
+        {''.join(f"  {'✅' if status else '❌'} {name}" for name, status in api_status.items())}
 
         ⚙️ Settings:
-          • Max Keywords: {cls.MAX_TOTAL_KEYWORDS}
-          • Cache Duration: {cls.CACHE_DURATION}s
-          • Debug Mode: {'On' if cls.DEBUG else 'Off'}
-          • Default Location: {cls.DEFAULT_LOCATION} ({cls.DEFAULT_LANGUAGE})
+          • Max Keywords: {self.MAX_TOTAL_KEYWORDS}
+          • Cache Duration: {self.CACHE_DURATION}s
+          • Debug Mode: {'On' if self.DEBUG else 'Off'}
+          • Default Location: {self.DEFAULT_LOCATION} ({self.DEFAULT_LANGUAGE})
 
         🎯 Available Features:
           • Keyword Research APIs: {validation['api_count']}
-          • AI Campaign Generation: {'✅' if cls.GEMINI_API_KEY else '❌'}
+          • AI Campaign Generation: {'✅' if self.GEMINI_API_KEY else '❌'}
           • Data Analysis: ✅
 
         {'✅ Configuration Valid' if validation['valid'] else '❌ Configuration Issues Detected'}
         """
 
         if validation["errors"]:
-            summary += f"\nErrors:\n" + "\n".join(
-                [f"  • {error}" for error in validation["errors"]]
+            summary += "\nErrors:\n" + "\n".join(
+                f"  • {error}" for error in validation["errors"]
             )
 
         if validation["warnings"]:
-            summary += f"\nWarnings:\n" + "\n".join(
-                [f"  • {warning}" for warning in validation["warnings"]]
+            summary += "\nWarnings:\n" + "\n".join(
+                f"  • {warning}" for warning in validation["warnings"]
             )
 
         return summary
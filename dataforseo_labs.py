@@ -1,14 +1,44 @@
+import asyncio
 import base64
-import json
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
 from typing import Dict, List, Optional
 
-import requests
+import numpy as np
+import orjson
+
+_NUMBER_SUFFIXES = ((1_000_000, "M"), (1_000, "K"))
+
+# Keyed by the upper-cased levels extract_keyword_data produces
+COMPETITION_COLORS = {
+    "LOW": "#28a745",
+    "MEDIUM": "#ffc107",
+    "HIGH": "#dc3545",
+    "UNKNOWN": "#6c757d",
+}
+
+
+def _as_list(value) -> list:
+    """Return value if it is a list, otherwise an empty tuple to iterate over"""
+    return value if isinstance(value, list) else ()
 
 
 class DataForSEOLabs:
     """DataForSEO Labs API integration for keyword research"""
 
-    def __init__(self, login: str, password: str):
+    def __init__(
+        self,
+        login: str,
+        password: str,
+        cache_dir: Optional[str] = None,
+        cache_ttl: int = 3600,
+        cache_max_entries: int = 256,
+    ):
         self.login = login
         self.password = password
         self.base_url = "https://api.dataforseo.com/v3/dataforseo_labs/google"
@@ -16,6 +46,145 @@ class DataForSEOLabs:
             "Authorization": f'Basic {base64.b64encode(f"{login}:{password}".encode()).decode()}',
             "Content-Type": "application/json",
         }
+        # Pooled sessions reuse the keep-alive connection instead of a fresh
+        # TCP+TLS handshake per lookup. A requests.Session must not be driven
+        # from several threads at once, and the app calls one shared client
+        # from worker threads, so each thread lazily gets its own session.
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        self.timeout = 30.0
+        self.related_keywords_url = f"{self.base_url}/related_keywords/live"
+        self.task_defaults = {
+            "include_seed_keyword": False,
+            "include_serp_info": True,
+            "ignore_synonyms": False,
+            "include_clickstream_data": False,
+            "replace_with_core_keyword": False,
+        }
+        # Optional on-disk cache of successful related_keywords responses, so
+        # repeated lookups survive restarts without paying for the API again
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _session(self):
+        """The calling thread's pooled HTTP session, created on first use"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        """Close the pooled HTTP sessions of every thread"""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+
+    def _related_keywords_task(
+        self,
+        seed_keyword: str,
+        location_code: int,
+        language_code: str,
+        depth: int,
+        limit: int,
+    ) -> Dict:
+        """Build a single related_keywords task for the request body"""
+        task = self.task_defaults.copy()
+        task.update(
+            keyword=seed_keyword,
+            location_code=location_code,
+            language_code=language_code,
+            depth=depth,
+            limit=limit,
+        )
+        return task
+
+    def _post_related_keywords(self, payload: List[Dict]) -> Optional[Dict]:
+        """POST a list of related_keywords tasks and return the parsed response"""
+        import requests
+
+        try:
+            response = self._session().post(
+                self.related_keywords_url, json=payload, timeout=self.timeout
+            )
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except requests.exceptions.RequestException as e:
+            print(f"API request failed: {str(e)}")
+            return None
+        except orjson.JSONDecodeError as e:
+            print(f"Failed to parse API response: {str(e)}")
+            return None
+
+    def _cache_path(self, task: Dict) -> str:
+        """Path of the cache file for a related_keywords task"""
+        key = hashlib.sha256(orjson.dumps(task, option=orjson.OPT_SORT_KEYS))
+        return os.path.join(self.cache_dir, f"{key.hexdigest()}.json")
+
+    def _read_cache(self, path: str) -> Optional[Dict]:
+        """Load a cached response, or None (deleting the file) if it is expired"""
+        try:
+            if time.time() - os.path.getmtime(path) > self.cache_ttl:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+    def _write_cache(self, path: str, api_response: Dict):
+        """Atomically store a response so readers never see a partial file"""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(api_response))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Failed to cache API response: {str(e)}")
+            return
+        self._prune_cache()
+
+    def _prune_cache(self):
+        """Delete the oldest cached responses beyond cache_max_entries"""
+        try:
+            entries = [
+                entry
+                for entry in os.scandir(self.cache_dir)
+                if entry.name.endswith(".json")
+            ]
+        except OSError:
+            return
+        if len(entries) <= self.cache_max_entries:
+            return
+
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[: len(entries) - self.cache_max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def clear_cache(self):
+        """Delete every cached related_keywords response"""
+        if not self.cache_dir:
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
 
     def get_related_keywords(
         self,
@@ -38,33 +207,126 @@ class DataForSEOLabs:
         Returns:
             Dictionary containing keyword data or None if error
         """
-        url = f"{self.base_url}/related_keywords/live"
-
-        payload = [
-            {
-                "keyword": seed_keyword,
-                "location_code": location_code,
-                "language_code": language_code,
-                "depth": depth,
-                "include_seed_keyword": False,
-                "include_serp_info": True,
-                "ignore_synonyms": False,
-                "include_clickstream_data": False,
-                "replace_with_core_keyword": False,
-                "limit": limit,
-            }
-        ]
+        task = self._related_keywords_task(
+            seed_keyword, location_code, language_code, depth, limit
+        )
+        if not self.cache_dir:
+            return self._post_related_keywords([task])
+
+        cache_path = self._cache_path(task)
+        api_response = self._read_cache(cache_path)
+        if api_response is None:
+            api_response = self._post_related_keywords([task])
+            if api_response and api_response.get("status_code") == 20000:
+                self._write_cache(cache_path, api_response)
+        return api_response
+
+    def get_related_keywords_batch(
+        self,
+        seed_keywords: List[str],
+        location_code: int = 2840,
+        language_code: str = "en",
+        depth: int = 3,
+        limit: int = 10,
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch related keywords for several seed keywords in a single request,
+        answering seeds that are already in the disk cache without the API
 
-        try:
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"API request failed: {str(e)}")
-            return None
-        except json.JSONDecodeError as e:
-            print(f"Failed to parse API response: {str(e)}")
-            return None
+        Args:
+            seed_keywords: The keywords to find related keywords for
+            location_code: Location code (2840 for US)
+            language_code: Language code (en for English)
+            depth: Depth of keyword research
+            limit: Maximum number of keywords to return per seed keyword
+
+        Returns:
+            Dictionary mapping each seed keyword to a response holding only its
+            own task (same shape as get_related_keywords), or None if error
+        """
+        if not seed_keywords:
+            return {}
+
+        responses = {}
+        uncached = {}
+        for seed_keyword in seed_keywords:
+            task = self._related_keywords_task(
+                seed_keyword, location_code, language_code, depth, limit
+            )
+            if self.cache_dir:
+                cached = self._read_cache(self._cache_path(task))
+                if cached is not None:
+                    responses[seed_keyword] = cached
+                    continue
+            uncached[seed_keyword] = task
+
+        if uncached:
+            api_response = self._post_related_keywords(list(uncached.values()))
+            tasks = (
+                api_response.get("tasks") if isinstance(api_response, dict) else None
+            )
+            # The API does not promise to answer in request order, so each
+            # result is matched on the keyword echoed back in its task data
+            by_keyword = {}
+            for task in tasks if isinstance(tasks, list) else []:
+                if isinstance(task, dict) and isinstance(task.get("data"), dict):
+                    by_keyword.setdefault(task["data"].get("keyword"), task)
+
+            for seed_keyword, request_task in uncached.items():
+                task = by_keyword.get(seed_keyword)
+                if task is None:
+                    responses[seed_keyword] = None
+                    continue
+                responses[seed_keyword] = {**api_response, "tasks": [task]}
+                if self.cache_dir and task.get("status_code") == 20000:
+                    self._write_cache(
+                        self._cache_path(request_task), responses[seed_keyword]
+                    )
+
+        return {seed_keyword: responses[seed_keyword] for seed_keyword in seed_keywords}
+
+    async def get_related_keywords_many(
+        self,
+        seed_keywords: List[str],
+        concurrency: int = 5,
+        location_code: int = 2840,
+        language_code: str = "en",
+        depth: int = 3,
+        limit: int = 10,
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch related keywords for several seed keywords as parallel requests
+
+        Unlike get_related_keywords_batch, each seed keyword is its own request,
+        so one slow or failed seed does not hold up or fail the others. At most
+        ``concurrency`` worker threads run at once, each with its own session.
+
+        Args:
+            seed_keywords: The keywords to find related keywords for
+            concurrency: Maximum number of requests in flight at once
+            location_code: Location code (2840 for US)
+            language_code: Language code (en for English)
+            depth: Depth of keyword research
+            limit: Maximum number of keywords to return per seed keyword
+
+        Returns:
+            Dictionary mapping each seed keyword to its response, or None if error
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _fetch(seed_keyword: str) -> Optional[Dict]:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self.get_related_keywords,
+                    seed_keyword,
+                    location_code,
+                    language_code,
+                    depth,
+                    limit,
+                )
+
+        responses = await asyncio.gather(*(_fetch(s) for s in seed_keywords))
+        return dict(zip(seed_keywords, responses))
 
     def extract_keyword_data(self, api_response: Dict) -> List[Dict]:
         """
@@ -77,62 +339,46 @@ class DataForSEOLabs:
         Returns:
             List of dictionaries containing structured keyword data
         """
-        keywords_data = []
         if not api_response or not isinstance(api_response, dict):
             return []
 
-        tasks = api_response.get("tasks")
-        if not tasks or not isinstance(tasks, list):
-            return []
-
-        for task in tasks:
-            if not task or task.get("status_code") != 20000:
-                continue
+        items = (
+            item
+            for task in _as_list(api_response.get("tasks"))
+            if isinstance(task, dict) and task.get("status_code") == 20000
+            for result_item in _as_list(task.get("result"))
+            if isinstance(result_item, dict)
+            for item in _as_list(result_item.get("items"))
+            if item and isinstance(item, dict)
+        )
 
-            result_list = task.get("result")
-            if not result_list or not isinstance(result_list, list):
+        keywords_data = []
+        append = keywords_data.append
+        for item in items:
+            keyword_data = item.get("keyword_data") or {}
+            keyword = keyword_data.get("keyword", "")
+            if not keyword:
                 continue
 
-            for result_item in result_list:
-                if not result_item or not isinstance(result_item, dict):
-                    continue
-
-                items = result_item.get("items")
-                if not items or not isinstance(items, list):
-                    continue
-
-                for item in items:
-                    if not item or not isinstance(item, dict):
-                        continue
-
-                    keyword_data = item.get("keyword_data") or {}
-                    keyword_info = keyword_data.get("keyword_info") or {}
-                    keyword_properties = keyword_data.get("keyword_properties") or {}
-
-                    structured_data = {
-                        "keyword": keyword_data.get("keyword", ""),
-                        "competition": keyword_info.get("competition", 0.0),
-                        "competition_level": keyword_info.get(
-                            "competition_level", "UNKNOWN"
-                        ),
-                        "cpc": keyword_info.get("cpc", 0.0),
-                        "search_volume": keyword_info.get("search_volume", 0),
-                        "low_top_of_page_bid": keyword_info.get(
-                            "low_top_of_page_bid", 0.0
-                        ),
-                        "high_top_of_page_bid": keyword_info.get(
-                            "high_top_of_page_bid", 0.0
-                        ),
-                        "keyword_difficulty": keyword_properties.get(
-                            "keyword_difficulty", 0
-                        ),
-                        "related_keywords": item.get("related_keywords") or [],
-                        "depth": item.get("depth", 0),
-                        "monthly_searches": keyword_info.get("monthly_searches") or [],
-                    }
-
-                    if structured_data["keyword"]:
-                        keywords_data.append(structured_data)
+            info = (keyword_data.get("keyword_info") or {}).get
+            properties = keyword_data.get("keyword_properties") or {}
+            append(
+                {
+                    "keyword": keyword,
+                    "competition": info("competition", 0.0),
+                    "competition_level": (
+                        info("competition_level") or "UNKNOWN"
+                    ).upper(),
+                    "cpc": info("cpc", 0.0),
+                    "search_volume": info("search_volume", 0),
+                    "low_top_of_page_bid": info("low_top_of_page_bid", 0.0),
+                    "high_top_of_page_bid": info("high_top_of_page_bid", 0.0),
+                    "keyword_difficulty": properties.get("keyword_difficulty", 0),
+                    "related_keywords": item.get("related_keywords") or [],
+                    "depth": item.get("depth", 0),
+                    "monthly_searches": info("monthly_searches") or [],
+                }
+            )
 
         return keywords_data
 
@@ -146,30 +392,27 @@ class DataForSEOLabs:
         Returns:
             Color string for Streamlit styling
         """
-        color_map = {
-            "LOW": "#28a745",
-            "MEDIUM": "#ffc107",
-            "HIGH": "#dc3545",
-            "UNKNOWN": "#6c757d",
-        }
-        return color_map.get(competition_level.upper(), "#6c757d")
+        return COMPETITION_COLORS.get(competition_level.upper(), "#6c757d")
 
-    def format_currency(self, value: float) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def format_currency(value: float) -> str:
         """Format currency values"""
         return f"${value:.2f}" if value is not None else "$0.00"
 
-    def format_number(self, value: int) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def format_number(value: int) -> str:
         """Format large numbers with commas"""
         if not value:
             return "0"
-        if value >= 1000000:
-            return f"{value/1000000:.1f}M"
-        elif value >= 1000:
-            return f"{value/1000:.1f}K"
-        else:
-            return str(value)
-
-    def get_keyword_analysis_data(self, keywords_data: List[Dict]) -> Dict:
+        for threshold, suffix in _NUMBER_SUFFIXES:
+            if value >= threshold:
+                return f"{value / threshold:.1f}{suffix}"
+        return str(value)
+
+    @staticmethod
+    def get_keyword_analysis_data(keywords_data: List[Dict]) -> Dict:
         """
         Prepare data for analysis charts and graphs
 
@@ -182,41 +425,42 @@ class DataForSEOLabs:
         if not keywords_data:
             return {}
 
-        search_volumes = [
-            kw["search_volume"] for kw in keywords_data if kw.get("search_volume")
-        ]
-        cpc_values = [kw["cpc"] for kw in keywords_data if kw.get("cpc") is not None]
+        # One (N, 3) float array of volume, cpc and difficulty; None becomes NaN
+        numerics = np.array(
+            [
+                (
+                    kw.get("search_volume"),
+                    kw.get("cpc"),
+                    kw.get("keyword_difficulty"),
+                )
+                for kw in keywords_data
+            ],
+            dtype=np.float64,
+        )
+        present = ~np.isnan(numerics)
+
+        search_volumes = numerics[present[:, 0] & (numerics[:, 0] != 0), 0]
+        cpc_values = numerics[present[:, 1], 1]
+        keyword_difficulties = numerics[present[:, 2], 2]
+
         competition_levels = [
-            kw["competition_level"]
-            for kw in keywords_data
-            if kw.get("competition_level")
+            level for kw in keywords_data if (level := kw.get("competition_level"))
         ]
-        keyword_difficulties = [
-            kw["keyword_difficulty"]
-            for kw in keywords_data
-            if kw.get("keyword_difficulty") is not None
-        ]
-        keywords = [kw["keyword"] for kw in keywords_data]
-
-        competition_counts = {}
-        for level in competition_levels:
-            competition_counts[level] = competition_counts.get(level, 0) + 1
+        competition_counts = dict(Counter(competition_levels))
 
         analysis_data = {
-            "keywords": keywords,
-            "search_volumes": search_volumes,
-            "cpc_values": cpc_values,
+            "keywords": [kw.get("keyword") for kw in keywords_data],
+            "search_volumes": search_volumes.astype(np.int64).tolist(),
+            "cpc_values": cpc_values.tolist(),
             "competition_levels": competition_levels,
             "competition_counts": competition_counts,
-            "keyword_difficulties": keyword_difficulties,
+            "keyword_difficulties": keyword_difficulties.tolist(),
             "avg_search_volume": (
-                sum(search_volumes) / len(search_volumes) if search_volumes else 0
+                float(search_volumes.mean()) if search_volumes.size else 0
             ),
-            "avg_cpc": sum(cpc_values) / len(cpc_values) if cpc_values else 0,
+            "avg_cpc": float(cpc_values.mean()) if cpc_values.size else 0,
             "avg_difficulty": (
-                sum(keyword_difficulties) / len(keyword_difficulties)
-                if keyword_difficulties
-                else 0
+                float(keyword_difficulties.mean()) if keyword_difficulties.size else 0
             ),
             "total_keywords": len(keywords_data),
         }
@@ -267,7 +511,7 @@ def main():
             "❌ No keywords extracted! The API may have returned no items for this keyword."
         )
         print("\nRaw Response for debugging:")
-        print(json.dumps(raw_response, indent=2))
+        print(orjson.dumps(raw_response, option=orjson.OPT_INDENT_2).decode())
         return
 
     print(f"✅ Extracted {len(keywords_data)} keywords")
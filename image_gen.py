@@ -5,21 +5,38 @@ import re
 from io import BytesIO
 from typing import Optional
 
-from google import genai
-from PIL import Image
-
 from config import Config
 
 os.makedirs("images", exist_ok=True)
 
+_FILENAME_STRIP = re.compile(r"[^\w\s-]")
+_FILENAME_DASHES = re.compile(r"[-\s]+")
+
+
+def _save_png(filepath: str, image_data: bytes, mime_type: Optional[str]) -> None:
+    """Write image bytes as a PNG file, re-encoding only when they are not PNG"""
+    if mime_type == "image/png":
+        with open(filepath, "wb") as f:
+            f.write(image_data)
+    else:
+        from PIL import Image
+
+        Image.open(BytesIO(image_data)).save(filepath, format="PNG")
+
 
 class ImageGenerator:
     """Generates images for ad campaigns using the Gemini API."""
 
     def __init__(self, config: Config):
+        # Deferred like the text SDK in LLMGenerator, to keep cold starts light
+        from google import genai
+
         self.api_key = config.GEMINI_API_KEY
         self.model_name = config.GEMINI_IMAGE_MODEL
         self.client = None
+        self.generation_config = genai.types.GenerateContentConfig(
+            response_modalities=["TEXT", "IMAGE"]
+        )
         if self.api_key:
             try:
                 self.client = genai.Client(api_key=self.api_key)
@@ -32,9 +49,8 @@ class ImageGenerator:
 
     def _sanitize_filename(self, text: str) -> str:
         """Sanitizes a string to be used as a valid filename."""
-        text = re.sub(r"[^\w\s-]", "", text).strip().lower()
-        text = re.sub(r"[-\s]+", "-", text)
-        return text[:50]
+        text = _FILENAME_STRIP.sub("", text).strip().lower()
+        return _FILENAME_DASHES.sub("-", text)[:50]
 
     async def generate_image(self, prompt: str, filename_prefix: str) -> Optional[str]:
         """
@@ -57,9 +73,7 @@ class ImageGenerator:
             response = await self.client.aio.models.generate_content(
                 model=self.model_name,
                 contents=prompt,
-                config=genai.types.GenerateContentConfig(
-                    response_modalities=["TEXT", "IMAGE"]
-                ),
+                config=self.generation_config,
             )
 
             image_part = None
@@ -75,15 +89,17 @@ class ImageGenerator:
                     print(f"Gemini Response Text: {text_part}")
                 return None
 
-            image_data = image_part.inline_data.data
-            image = Image.open(BytesIO(image_data))
-
             sanitized_prefix = self._sanitize_filename(filename_prefix)
             random_suffix = base64.b16encode(os.urandom(4)).decode().lower()
             filename = f"{sanitized_prefix}-{random_suffix}.png"
             filepath = os.path.join("images", filename)
 
-            image.save(filepath)
+            await asyncio.to_thread(
+                _save_png,
+                filepath,
+                image_part.inline_data.data,
+                image_part.inline_data.mime_type,
+            )
             print(f"Image saved to {filepath}")
             return filepath
 
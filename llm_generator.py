@@ -1,10 +1,13 @@
 import asyncio
-import json
+import heapq
 import os
+import re
+import string
 import time
-from typing import Any, Dict, List, Optional
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-import google.generativeai as genai
+import orjson
 
 from config import Config
 from image_gen import ImageGenerator
@@ -53,20 +56,117 @@ The JSON structure for each campaign object must be:
 """
 
 
+def _split_template(template: str) -> List[str]:
+    """Literal text between a format template's fields, with {{ }} unescaped"""
+    parts = [""]
+    for literal, field_name, _, _ in string.Formatter().parse(template):
+        parts[-1] += literal
+        if field_name is not None:
+            parts.append("")
+    return parts
+
+
+# PROMPT split once around its {topic} and {keyword_context} fields, so each
+# prompt is a join instead of a str.format pass over the whole template
+_PROMPT_HEAD, _PROMPT_MID, _PROMPT_TAIL = _split_template(PROMPT)
+
+# Characters that change JSON nesting or string state; everything else is skipped
+_JSON_STRUCTURE = re.compile(r'[\[\]{}"\\]')
+
+
+class _ArrayObjectSplitter:
+    """
+    Cuts complete objects out of a JSON array as its text streams in, so each
+    campaign can be used before the rest of the array has been generated.
+    Text around the array (e.g. markdown fences) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.scanned = 0
+        self.stack: List[str] = []
+        self.in_string = False
+        self.skip_at = -1
+        self.start: Optional[int] = None
+
+    def feed(self, text: str) -> List[str]:
+        """Add a chunk of text and return the objects it completed"""
+        self.buffer += text
+        completed = []
+        for match in _JSON_STRUCTURE.finditer(self.buffer, self.scanned):
+            i, char = match.start(), match.group()
+            if i == self.skip_at:
+                continue
+            if self.in_string:
+                if char == "\\":
+                    self.skip_at = i + 1
+                elif char == '"':
+                    self.in_string = False
+            elif not self.stack:
+                if char in "[{":
+                    self.stack.append(char)
+            elif char == '"':
+                self.in_string = True
+            elif char in "[{":
+                if char == "{" and self.stack == ["["]:
+                    self.start = i
+                self.stack.append(char)
+            else:
+                self.stack.pop()
+                if char == "}" and self.stack == ["["] and self.start is not None:
+                    completed.append(self.buffer[self.start : i + 1])
+                    self.start = None
+
+        # Only an object still being received needs to be kept
+        consumed = len(self.buffer) if self.start is None else self.start
+        self.buffer = self.buffer[consumed:]
+        self.skip_at -= consumed
+        if self.start is not None:
+            self.start = 0
+        self.scanned = len(self.buffer)
+        return completed
+
+
+KEYWORD_CONTEXT_LINE = (
+    "Keyword: {keyword} | Volume: {search_volume:,} | CPC: ${cpc:.2f} | "
+    "Competition: {competition_level} | Difficulty: {difficulty}/100"
+)
+
+
 class LLMGenerator:
     """AI-powered campaign generator using Gemini for keyword data"""
 
     def __init__(self, config: Config):
+        # Imported here rather than at module level: the SDK pulls in grpc and
+        # protobuf, which the app's landing page never needs
+        import google.generativeai as genai
+
         self.api_key = config.GEMINI_API_KEY
         self.model_name = config.GEMINI_MODEL
         self.client = None
-        self.last_request_time = 0
-        self.request_delay = 2.0
+        self.model = None
+        self.generation_config = genai.types.GenerationConfig(
+            response_mime_type="application/json",
+            temperature=0.2,
+            max_output_tokens=8192,
+        )
+        # Token bucket over the per-minute Gemini quota: bursts up to the
+        # configured size go straight through, and calls only wait once the
+        # bucket runs dry
+        self.rate_limit = max(1, config.RATE_LIMITS["gemini"])
+        self.burst = max(1, config.RATE_LIMIT_BURSTS["gemini"])
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self._rate_lock = asyncio.Lock()
         self.image_generator = ImageGenerator(config)
+        # Caps image requests in flight when campaigns are streamed one by one
+        self.image_concurrency = 5
+        self._image_semaphore = asyncio.Semaphore(self.image_concurrency)
 
         if self.api_key:
             try:
                 genai.configure(api_key=self.api_key)
+                self.model = genai.GenerativeModel(self.model_name)
                 self.client = True
             except Exception as e:
                 print(f"Error initializing Gemini client: {e}")
@@ -77,11 +177,32 @@ class LLMGenerator:
 
     async def _wait_for_rate_limit(self):
         """Implement rate limiting for Gemini API"""
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
-        if elapsed < self.request_delay:
-            await asyncio.sleep(self.request_delay - elapsed)
-        self.last_request_time = time.time()
+        refill_rate = self.rate_limit / 60.0
+        async with self._rate_lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.last_refill) * refill_rate
+            )
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self.tokens) / refill_rate)
+            self.tokens = 0.0
+            self.last_refill = time.monotonic()
+
+    async def _attach_image(self, campaign: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate the image for a single campaign and attach its path."""
+        image_prompt = campaign.get("image_prompt")
+        title = campaign.get("title", "untitled-campaign")
+        if image_prompt:
+            async with self._image_semaphore:
+                image_path = await self.image_generator.generate_image(
+                    image_prompt, title
+                )
+            campaign["image_path"] = image_path
+        return campaign
 
     async def _generate_and_attach_images(
         self, campaigns: List[Dict[str, Any]]
@@ -93,20 +214,69 @@ class LLMGenerator:
             print("Image generator not available, skipping image generation.")
             return campaigns
 
-        async def process_campaign(campaign: Dict[str, Any]) -> Dict[str, Any]:
-            image_prompt = campaign.get("image_prompt")
-            title = campaign.get("title", "untitled-campaign")
-            if image_prompt:
-                await asyncio.sleep(1)
-                image_path = await self.image_generator.generate_image(
-                    image_prompt, title
-                )
-                campaign["image_path"] = image_path
-            return campaign
+        # Same per-campaign path and shared semaphore as the streaming
+        # pipeline, so both respect one image concurrency limit
+        return list(await asyncio.gather(*map(self._attach_image, campaigns)))
 
-        tasks = [process_campaign(c) for c in campaigns]
-        processed_campaigns = await asyncio.gather(*tasks)
-        return processed_campaigns
+    async def _stream_campaign_ideas(
+        self, keywords_data: List[Dict[str, Any]], topic: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Ask Gemini for campaign ideas based on keyword data, without images,
+        yielding each campaign as soon as its JSON object has been streamed.
+        Each campaign is tagged with its position in Gemini's answer under
+        "stream_index" so callers can restore that order.
+        """
+        await self._wait_for_rate_limit()
+
+        top_keywords = heapq.nlargest(
+            20, keywords_data, key=lambda x: x.get("search_volume", 0)
+        )
+
+        keyword_context = self._prepare_keyword_context(top_keywords)
+
+        prompt = "".join(
+            (_PROMPT_HEAD, topic, _PROMPT_MID, keyword_context, _PROMPT_TAIL)
+        )
+
+        response = await self.model.generate_content_async(
+            prompt, generation_config=self.generation_config, stream=True
+        )
+
+        splitter = _ArrayObjectSplitter()
+        chunks = []
+        yielded = 0
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                continue
+            chunks.append(text)
+            for object_text in splitter.feed(text):
+                try:
+                    campaign = orjson.loads(object_text)
+                except orjson.JSONDecodeError as e:
+                    print(f"Skipping malformed campaign object: {e}")
+                    continue
+                if isinstance(campaign, dict):
+                    campaign["stream_index"] = yielded
+                    yielded += 1
+                    yield campaign
+
+        # Nothing recognisable came through incrementally; fall back to the
+        # whole-response parser and its cleanup heuristics
+        if not yielded:
+            campaigns = self._parse_campaign_response("".join(chunks))
+            for index, campaign in enumerate(campaigns):
+                if isinstance(campaign, dict):
+                    campaign["stream_index"] = index
+                yield campaign
+
+    async def _generate_campaign_ideas(
+        self, keywords_data: List[Dict[str, Any]], topic: str
+    ) -> List[Dict[str, Any]]:
+        """Ask Gemini for campaign ideas based on keyword data, without images"""
+        return [c async for c in self._stream_campaign_ideas(keywords_data, topic)]
 
     async def generate_campaigns_from_keywords(
         self, keywords_data: List[Dict[str, Any]], topic: str
@@ -115,48 +285,66 @@ class LLMGenerator:
         if not self.is_available():
             return []
 
-        await self._wait_for_rate_limit()
+        campaigns = await self._generate_campaign_ideas(keywords_data, topic)
+        if not campaigns:
+            return []
 
-        top_keywords = sorted(
-            keywords_data, key=lambda x: x.get("search_volume", 0), reverse=True
-        )[:20]
+        return await self._generate_and_attach_images(campaigns)
 
-        keyword_context = self._prepare_keyword_context(top_keywords)
+    async def stream_campaigns_from_keywords(
+        self, keywords_data: List[Dict[str, Any]], topic: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate campaign ideas based on keyword data, yielding each campaign
+        as soon as its image is ready instead of waiting for all of them.
+        Image generation for a campaign starts as soon as Gemini has finished
+        writing it, while the remaining campaigns are still streaming.
+        """
+        if not self.is_available():
+            return
 
-        prompt = PROMPT.format(topic=topic, keyword_context=keyword_context)
+        # Closing the Gemini stream explicitly keeps an abandoned run from
+        # leaving it suspended on a long-lived event loop
+        async with aclosing(
+            self._stream_campaign_ideas(keywords_data, topic)
+        ) as campaigns:
+            if not self.image_generator.is_available():
+                print("Image generator not available, skipping image generation.")
+                async for campaign in campaigns:
+                    yield campaign
+                return
 
-        model = genai.GenerativeModel(self.model_name)
-        response = await model.generate_content_async(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                response_mime_type="application/json",
-                temperature=0.2,
-                max_output_tokens=8192,
-            ),
-        )
-        campaigns = self._parse_campaign_response(response.text)
-        if not campaigns:
-            return []
+            pending = set()
+            try:
+                async for campaign in campaigns:
+                    pending.add(asyncio.create_task(self._attach_image(campaign)))
+                    finished = {task for task in pending if task.done()}
+                    pending -= finished
+                    for task in finished:
+                        yield task.result()
 
-        return await self._generate_and_attach_images(campaigns)
+                while pending:
+                    finished, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in finished:
+                        yield task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
 
     def _prepare_keyword_context(self, keywords: List[Dict[str, Any]]) -> str:
         """Prepare keyword data context for prompts"""
-        context_lines = []
-        for kw in keywords:
-            search_volume = kw.get("search_volume") or 0
-            cpc = kw.get("cpc") or 0.0
-            difficulty = kw.get("keyword_difficulty") or 0
-
-            line = (
-                f"Keyword: {kw.get('keyword', '')} | "
-                f"Volume: {search_volume:,} | "
-                f"CPC: ${cpc:.2f} | "
-                f"Competition: {kw.get('competition_level', 'N/A')} | "
-                f"Difficulty: {difficulty}/100"
+        return "\n".join(
+            KEYWORD_CONTEXT_LINE.format(
+                keyword=kw.get("keyword", ""),
+                search_volume=kw.get("search_volume") or 0,
+                cpc=kw.get("cpc") or 0.0,
+                competition_level=kw.get("competition_level", "N/A"),
+                difficulty=kw.get("keyword_difficulty") or 0,
             )
-            context_lines.append(line)
-        return "\n".join(context_lines)
+            for kw in keywords
+        )
 
     def _parse_campaign_response(self, response_text: str) -> List[Dict[str, Any]]:
         """
@@ -173,11 +361,11 @@ class LLMGenerator:
             text = text[:-3].strip()
 
         try:
-            data = json.loads(text)
+            data = orjson.loads(text)
             if isinstance(data, list):
                 return data
             return []
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             print(
                 f"Initial JSON parsing failed: {e}. Attempting to slice and re-parse..."
             )
@@ -187,11 +375,11 @@ class LLMGenerator:
             if start != -1 and end != -1:
                 json_str = text[start : end + 1]
                 try:
-                    data = json.loads(json_str)
+                    data = orjson.loads(json_str)
                     if isinstance(data, list):
                         print("✅ Fallback JSON parsing successful after slicing.")
                         return data
-                except json.JSONDecodeError as final_e:
+                except orjson.JSONDecodeError as final_e:
                     print(f"Fallback JSON parsing failed even after slicing: {final_e}")
                     print(f">>> Offending Text\n{response_text}")
                     return []
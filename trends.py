@@ -2,9 +2,6 @@ import asyncio
 import json
 from typing import Dict, List, Optional
 
-import requests
-from google import genai
-
 from config import Config
 
 PROMPT_TEMPLATE = """
@@ -47,6 +44,9 @@ class TrendsAnalyzer:
     """Fetches and analyzes trending topics to suggest a campaign idea."""
 
     def __init__(self, config: Config):
+        # Deferred like the SDK imports in LLMGenerator, to keep cold starts light
+        from google import genai
+
         self.config = config
         self.searchapi_key = config.SEARCHAPI_KEY
         self.gemini_key = config.GEMINI_API_KEY
@@ -63,11 +63,17 @@ class TrendsAnalyzer:
             "travel_and_transportation",
             "pets_and_animals",
         ]
+        self.generation_config = genai.types.GenerateContentConfig(
+            response_mime_type="application/json",
+            temperature=0.5,
+        )
         if self.gemini_key:
             self.client = genai.Client(api_key=self.gemini_key)
 
     def _fetch_trending_searches(self, geo: str = "US") -> Optional[Dict]:
         """Fetches trending searches from SearchAPI."""
+        import requests
+
         if not self.searchapi_key:
             print("SearchAPI key is not configured.")
             return None
@@ -157,10 +163,7 @@ class TrendsAnalyzer:
             response = await self.client.aio.models.generate_content(
                 model=self.gemini_model,
                 contents=prompt,
-                config=genai.types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    temperature=0.5,
-                ),
+                config=self.generation_config,
             )
             response_text = response.text
 